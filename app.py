@@ -53,105 +53,8 @@ if st.session_state.get("logged_in"):
     with st.sidebar:
         st.title("🏢 Workforce System")
 
-        # User & Role badge
-        st.markdown(f"👤 **User:** `{username}`")
-        st.markdown(f"🧑‍💼 **Role:** `{role}`")
-
-        # ── CSV IMPORT (Admin / HR only) ───────────────────────
-        if role in ["Admin", "HR"]:
-            st.divider()
-            st.markdown("### 📥 Import Employee CSV")
-
-            with st.expander("Upload CSV File", expanded=False):
-                st.caption(
-                    "CSV must have columns: **Name, Age, Gender, Department, "
-                    "Role, Skills, Join_Date, Status, Salary, Location**\n\n"
-                    "Optional: Resign_Date"
-                )
-
-                # Download sample template
-                sample_data = {
-                    "Name":        ["Aarav Sharma", "Priya Patel"],
-                    "Age":         [28, 32],
-                    "Gender":      ["Male", "Female"],
-                    "Department":  ["IT", "HR"],
-                    "Role":        ["Software Engineer", "HR Manager"],
-                    "Skills":      ["Python:4;SQL:3", "Recruitment:5;Excel:4"],
-                    "Join_Date":   ["2022-06-01", "2021-03-15"],
-                    "Resign_Date": ["", ""],
-                    "Status":      ["Active", "Active"],
-                    "Salary":      [75000, 65000],
-                    "Location":    ["Bangalore", "Mumbai"],
-                }
-                sample_df  = pd.DataFrame(sample_data)
-                sample_csv = sample_df.to_csv(index=False).encode("utf-8")
-
-                st.download_button(
-                    "⬇️ Download Sample CSV",
-                    sample_csv,
-                    "employee_template.csv",
-                    "text/csv",
-                    use_container_width=True
-                )
-
-                uploaded_csv = st.file_uploader(
-                    "Choose CSV file",
-                    type=["csv"],
-                    key="sidebar_csv_upload"
-                )
-
-                if uploaded_csv is not None:
-                    try:
-                        csv_df = pd.read_csv(uploaded_csv)
-
-                        required_cols = ["Name", "Department", "Role", "Status"]
-                        missing = [c for c in required_cols if c not in csv_df.columns]
-
-                        if missing:
-                            st.error(f"Missing columns: {missing}")
-                        else:
-                            # Fill optional columns with defaults
-                            csv_df["Age"]         = csv_df.get("Age",         pd.Series([30] * len(csv_df))).fillna(30)
-                            csv_df["Gender"]      = csv_df.get("Gender",      pd.Series(["Male"] * len(csv_df))).fillna("Male")
-                            csv_df["Skills"]      = csv_df.get("Skills",      pd.Series(["Excel:3"] * len(csv_df))).fillna("Excel:3")
-                            csv_df["Join_Date"]   = csv_df.get("Join_Date",   pd.Series([datetime.date.today().strftime("%Y-%m-%d")] * len(csv_df))).fillna(datetime.date.today().strftime("%Y-%m-%d"))
-                            csv_df["Resign_Date"] = csv_df.get("Resign_Date", pd.Series([""] * len(csv_df))).fillna("")
-                            csv_df["Salary"]      = csv_df.get("Salary",      pd.Series([50000] * len(csv_df))).fillna(50000)
-                            csv_df["Location"]    = csv_df.get("Location",    pd.Series(["Unknown"] * len(csv_df))).fillna("Unknown")
-
-                            st.dataframe(csv_df.head(5), use_container_width=True)
-                            st.caption(f"Preview: {len(csv_df)} employees found")
-
-                            if st.button("✅ Import All Employees", use_container_width=True, key="confirm_import"):
-                                success = 0
-                                errors  = 0
-                                for _, row in csv_df.iterrows():
-                                    try:
-                                        db.add_employee({
-                                            "Name":        str(row["Name"]),
-                                            "Age":         int(row["Age"]),
-                                            "Gender":      str(row["Gender"]),
-                                            "Department":  str(row["Department"]),
-                                            "Role":        str(row["Role"]),
-                                            "Skills":      str(row["Skills"]),
-                                            "Join_Date":   str(row["Join_Date"]),
-                                            "Resign_Date": str(row["Resign_Date"]),
-                                            "Status":      str(row["Status"]),
-                                            "Salary":      float(row["Salary"]),
-                                            "Location":    str(row["Location"]),
-                                        })
-                                        success += 1
-                                    except Exception:
-                                        errors += 1
-
-                                if success:
-                                    st.success(f"✅ {success} employees imported!")
-                                if errors:
-                                    st.warning(f"⚠️ {errors} rows skipped due to errors.")
-                                st.rerun()
-
-                    except Exception as e:
-                        st.error(f"Failed to read CSV: {e}")
+        # User & Role badge + CSV importer (shared with every page)
+        show_role_badge()
 
         st.divider()
         logout_user()
@@ -246,8 +149,7 @@ if df.empty:
         return pd.DataFrame(employees)
 
     gen_df = generate_employees(200)
-    for _, row in gen_df.iterrows():
-        db.add_employee(row.to_dict())
+    db.add_employees_bulk(gen_df)
 
     st.success(f"✅ Demo workforce created: {len(gen_df)} employees")
     st.rerun()
@@ -15,13 +15,11 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-import matplotlib.pyplot as plt
 import datetime
-import io
 
 from utils.auth import require_login, show_role_badge, logout_user
 from utils import database as db
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
 
 # -------------------------
 # Auth
@@ -78,7 +76,7 @@ with st.expander("➕ Add New Project", expanded=False):
                     """, (proj_name.strip(), owner_id, status_sel, progress,
                           str(start_date), str(due_date)))
                     conn.commit()
-                    conn.close()
+                    db.fetch_projects.clear()
                     st.success(f"✅ Project '{proj_name}' added!")
                     st.rerun()
     else:
@@ -139,12 +137,14 @@ def days_to_due(due_str):
 # Compute Health for all projects
 # -------------------------
 health_rows = []
-for _, row in project_df.iterrows():
-    progress  = int(row.get("progress", 0))
-    owner_id  = row.get("owner_emp_id")
+# Cast once per column instead of int(...) per row
+project_df["progress"] = pd.to_numeric(project_df["progress"], errors="coerce").fillna(0).astype(int)
+for row in project_df.itertuples(index=False):
+    progress  = row.progress
+    owner_id  = row.owner_emp_id
     mood      = mood_score(owner_id)
     att       = attendance_score(owner_id)
-    days_left = days_to_due(row.get("due_date", ""))
+    days_left = days_to_due(row.due_date)
 
     # Deadline penalty
     deadline_bonus = 0
@@ -155,10 +155,10 @@ for _, row in project_df.iterrows():
 
     health_score = min(100, max(0, progress + mood + att + deadline_bonus))
 
-    if row.get("status") == "Completed":
+    if row.status == "Completed":
         health_status = "✅ Completed"
         health_color  = "#22c55e"
-    elif row.get("status") == "Cancelled":
+    elif row.status == "Cancelled":
         health_status = "⛔ Cancelled"
         health_color  = "#94a3b8"
     elif health_score >= 70:
@@ -172,16 +172,16 @@ for _, row in project_df.iterrows():
         health_color  = "#ef4444"
 
     health_rows.append({
-        "Project ID":    row["project_id"],
-        "Project":       row["project_name"],
-        "Owner":         row["Owner"],
-        "Status":        row.get("status", "Active"),
+        "Project ID":    row.project_id,
+        "Project":       row.project_name,
+        "Owner":         row.Owner,
+        "Status":        row.status,
         "Progress (%)":  progress,
         "Health Score":  health_score,
         "Health Status": health_status,
         "_color":        health_color,
-        "Start Date":    row.get("start_date", ""),
-        "Due Date":      row.get("due_date", ""),
+        "Start Date":    row.start_date,
+        "Due Date":      row.due_date,
         "Days Left":     days_left,
     })
 
@@ -405,7 +405,8 @@ if not health_df.empty:
                 UPDATE projects SET project_name=?, status=?, progress=?, start_date=?, due_date=?
                 WHERE project_id=?
             """, (e_name, e_status, e_prog, str(e_start), str(e_due), sel_id))
-            conn.commit(); conn.close()
+            conn.commit()
+            db.fetch_projects.clear()
             st.success("✅ Project updated.")
             st.rerun()
 
@@ -413,7 +414,8 @@ if not health_df.empty:
             conn = db.connect_db()
             cur  = conn.cursor()
             cur.execute("DELETE FROM projects WHERE project_id=?", (sel_id,))
-            conn.commit(); conn.close()
+            conn.commit()
+            db.fetch_projects.clear()
             st.success("🗑️ Project deleted.")
             st.rerun()
 
@@ -424,7 +426,8 @@ st.divider()
 st.subheader("📄 Download Project Report PDF")
 
 if st.button("📋 Generate PDF"):
-    # Build matplotlib chart for PDF
+    # Build matplotlib chart for PDF (pyplot is only needed here, so import it on demand)
+    import matplotlib.pyplot as plt
     hcount = health_df["Health Status"].value_counts()
     color_list = [{"🟢 Healthy": "#22c55e","🟡 At Risk":"#f59e0b","🔴 Critical":"#ef4444",
                    "✅ Completed":"#667eea","⛔ Cancelled":"#94a3b8"}.get(l,"#667eea") for l in hcount.index]
@@ -434,17 +437,10 @@ if st.button("📋 Generate PDF"):
     for bar in bars:
         ax.text(bar.get_x()+bar.get_width()/2, bar.get_height(),
                 str(int(bar.get_height())), ha="center", va="bottom", fontsize=9)
-    plt.tight_layout()
-    buf = io.BytesIO()
-    fig_pdf.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    project_png = buf.read()
-    plt.close(fig_pdf)
-
-    pdf_buffer = io.BytesIO()
+    project_png = fig_to_png(fig_pdf)
+
     try:
-        generate_master_report(
-            buffer=pdf_buffer,
+        pdf_bytes = generate_master_report(
             employees_df=emp_df,
             attendance_df=attendance_df,
             mood_df=mood_df,
@@ -452,8 +448,7 @@ if st.button("📋 Generate PDF"):
             notifications_df=pd.DataFrame(),
             project_fig=project_png
         )
-        pdf_buffer.seek(0)
-        st.download_button("⬇️ Download PDF", pdf_buffer,
+        st.download_button("⬇️ Download PDF", pdf_bytes,
                            "project_health_report.pdf", "application/pdf")
     except Exception as e:
         st.error("PDF generation failed.")
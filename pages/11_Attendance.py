@@ -11,11 +11,11 @@ import streamlit as st
 import pandas as pd
 import datetime
 import matplotlib.pyplot as plt
-import io
 
 from utils.auth import require_login, show_role_badge, logout_user
 from utils import database as db
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
+from utils.analytics import map_emp_names
 
 # -------------------------
 # Authentication
@@ -41,8 +41,6 @@ try:
 except Exception:
     attendance_df = pd.DataFrame(columns=["emp_id", "date", "check_in", "check_out", "status"])
 
-emp_map = emp_df.set_index("Emp_ID")["Name"].to_dict() if not emp_df.empty else {}
-
 # -------------------------
 # Employee Selection
 # -------------------------
@@ -93,7 +91,7 @@ att_df = attendance_df.copy()
 if emp_id is not None:
     att_df = att_df[att_df["emp_id"] == emp_id]
 
-att_df["Date"] = pd.to_datetime(att_df["date"], errors="coerce")
+att_df["Date"] = pd.to_datetime(att_df["date"], format="ISO8601", cache=True, errors="coerce")
 
 att_df = att_df[
     (att_df["Date"] >= pd.to_datetime(start)) &
@@ -103,7 +101,7 @@ att_df = att_df[
 attendance_png = None  # image for PDF
 
 if not att_df.empty:
-    att_df["Employee"] = att_df["emp_id"].map(emp_map).fillna(att_df["emp_id"].astype(str))
+    att_df["Employee"] = map_emp_names(att_df["emp_id"], emp_df)
     display_df = att_df[["Employee", "Date", "check_in", "check_out", "status"]].sort_values("Date", ascending=False)
 
     st.dataframe(display_df, use_container_width=True)
@@ -136,10 +134,7 @@ if not att_df.empty:
     st.pyplot(fig)
 
     # ✅ Convert graph to PNG for PDF
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    attendance_png = buf.read()
+    attendance_png = fig_to_png(fig)
 
 else:
     st.info("No attendance records found for the selected criteria.")
@@ -154,10 +149,8 @@ allowed_roles_for_pdf = ["Admin", "Manager", "HR"]
 
 if role in allowed_roles_for_pdf:
     if st.button("Download Master PDF"):
-        pdf_buffer = io.BytesIO()
         try:
-            generate_master_report(
-                buffer=pdf_buffer,
+            pdf_bytes = generate_master_report(
                 employees_df=emp_df,
                 attendance_df=display_df if not att_df.empty else attendance_df,
                 mood_df=db.fetch_mood_logs(),
@@ -166,11 +159,10 @@ if role in allowed_roles_for_pdf:
                 mood_fig=attendance_png  # 👈 attendance graph added to PDF
             )
 
-            pdf_buffer.seek(0)
 
             st.download_button(
                 label="Download PDF",
-                data=pdf_buffer,
+                data=pdf_bytes,
                 file_name="workforce_master_report.pdf",
                 mime="application/pdf",
             )
@@ -194,9 +186,9 @@ if role in ["Admin", "Manager", "HR"]:
             required_cols = ["emp_id", "date", "check_in", "check_out", "status"]
 
             if all(col in df_csv.columns for col in required_cols):
-                db.bulk_add_attendance(df_csv)
+                added = db.bulk_add_attendance(df_csv)
                 attendance_df = db.fetch_attendance()
-                st.success("✅ Attendance imported successfully!")
+                st.success(f"✅ {added} attendance rows imported successfully!")
             else:
                 st.error(f"CSV missing required columns: {required_cols}")
 
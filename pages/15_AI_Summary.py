@@ -13,12 +13,11 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import requests
-import io
 from datetime import datetime, date
 
 from utils.auth import require_login, show_role_badge, logout_user
 from utils import database as db
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
 
 # -------------------------
 # Page Config & Auth
@@ -92,19 +91,21 @@ def compute_attrition_risk(emp_df, att_df, mood_df, feedback_df, tasks_df):
     """
     results = []
 
-    for _, emp in emp_df.iterrows():
-        eid = emp["Emp_ID"]
+    # Plain namedtuples: no per-row Series construction
+    emp_cols = ["Emp_ID", "Name", "Department", "Role", "Status"]
+    for emp in emp_df[emp_cols].itertuples(index=False):
+        eid = emp.Emp_ID
         risk = 0
         factors = []
 
         # Already resigned
-        if emp.get("Status") == "Resigned":
+        if emp.Status == "Resigned":
             results.append({
                 "Emp_ID": eid,
-                "Name": emp["Name"],
-                "Department": emp["Department"],
-                "Role": emp["Role"],
-                "Status": emp["Status"],
+                "Name": emp.Name,
+                "Department": emp.Department,
+                "Role": emp.Role,
+                "Status": emp.Status,
                 "Risk_Score": 100,
                 "Risk_Level": "🔴 Resigned",
                 "Key_Factors": "Employee has already resigned"
@@ -188,10 +189,10 @@ def compute_attrition_risk(emp_df, att_df, mood_df, feedback_df, tasks_df):
 
         results.append({
             "Emp_ID": eid,
-            "Name": emp["Name"],
-            "Department": emp["Department"],
-            "Role": emp["Role"],
-            "Status": emp["Status"],
+            "Name": emp.Name,
+            "Department": emp.Department,
+            "Role": emp.Role,
+            "Status": emp.Status,
             "Risk_Score": risk,
             "Risk_Level": level,
             "Key_Factors": "; ".join(factors) if factors else "No significant risk factors"
@@ -341,8 +342,8 @@ def build_attrition_prompt(emp_df, att_df, mood_df, feedback_df, risk_df) -> str
     high_risk = risk_df[risk_df["Risk_Level"] == "🔴 High Risk"].head(10)
     if not high_risk.empty:
         prompt_lines.append(f"TOP HIGH-RISK EMPLOYEES:")
-        for _, row in high_risk.iterrows():
-            prompt_lines.append(f"  - {row['Name']} ({row['Department']}, {row['Role']}): Score={row['Risk_Score']}, Factors: {row['Key_Factors']}")
+        for row in high_risk.itertuples(index=False):
+            prompt_lines.append(f"  - {row.Name} ({row.Department}, {row.Role}): Score={row.Risk_Score}, Factors: {row.Key_Factors}")
         prompt_lines.append("")
 
     # Mood summary
@@ -480,26 +481,18 @@ RISK SCORE TABLE:
         ax_pdf.set_ylabel("Count")
         for bar in ax_pdf.patches:
             ax_pdf.text(bar.get_x() + bar.get_width()/2, bar.get_height(), str(int(bar.get_height())), ha="center", va="bottom")
-        plt.tight_layout()
-        buf_pdf = io.BytesIO()
-        fig_pdf.savefig(buf_pdf, format="png", dpi=150, bbox_inches="tight")
-        buf_pdf.seek(0)
-        chart_png = buf_pdf.read()
-        plt.close(fig_pdf)
+        chart_png = fig_to_png(fig_pdf)
 
-        pdf_buffer = io.BytesIO()
         try:
-            generate_master_report(
-                buffer=pdf_buffer,
+            pdf_bytes = generate_master_report(
                 employees_df=risk_df,
                 projects_df=emp_df[emp_df["Status"] == "Resigned"],
                 project_fig=chart_png,
                 title="AI Workforce Attrition Report"
             )
-            pdf_buffer.seek(0)
             st.download_button(
                 "📥 Download PDF",
-                pdf_buffer,
+                pdf_bytes,
                 f"ai_attrition_report_{datetime.now().strftime('%Y%m%d')}.pdf",
                 "application/pdf",
                 use_container_width=True
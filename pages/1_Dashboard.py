@@ -12,7 +12,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import matplotlib.pyplot as plt
-import io
+from itertools import chain
 
 from utils import database as db
 from utils.analytics import (
@@ -21,7 +21,7 @@ from utils.analytics import (
     gender_ratio,
     average_salary_by_dept
 )
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 
@@ -151,12 +151,7 @@ if not df.empty and "Department" in df.columns:
             str(int(bar.get_height())),
             ha="center", va="bottom", fontsize=9
         )
-    plt.tight_layout()
-    buf = io.BytesIO()
-    fig_pdf.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    dashboard_png = buf.read()
-    plt.close(fig_pdf)
+    dashboard_png = fig_to_png(fig_pdf)
 else:
     st.info("No department data available.")
 
@@ -166,13 +161,12 @@ else:
 st.header("3️⃣ Skill Distribution")
 
 if not df.empty and "Skills" in df.columns:
-    skill_list = []
-    for s in df["Skills"].dropna():
-        parts = s.replace(";", ",").split(",")
-        for p in parts:
-            clean = p.split(":")[0].strip()   # strip :level suffix
-            if clean:
-                skill_list.append(clean)
+    # Flatten every employee's skill tokens in one linear pass
+    tokens = chain.from_iterable(s.replace(";", ",").split(",") for s in df["Skills"].dropna())
+    skill_list = [
+        clean for clean in (p.split(":")[0].strip() for p in tokens)   # strip :level suffix
+        if clean
+    ]
 
     if skill_list:
         skill_counts = pd.Series(skill_list).value_counts().head(15)
@@ -348,10 +342,8 @@ if st.button("Download Dashboard PDF"):
     if dashboard_png is None:
         st.error("No graph available to export.")
     else:
-        pdf_buffer = io.BytesIO()
         try:
-            generate_master_report(
-                buffer=pdf_buffer,
+            pdf_bytes = generate_master_report(
                 employees_df=df,
                 attendance_df=None,
                 mood_df=None,
@@ -359,10 +351,9 @@ if st.button("Download Dashboard PDF"):
                 notifications_df=None,
                 dashboard_fig=dashboard_png
             )
-            pdf_buffer.seek(0)
             st.download_button(
                 "⬇️ Download PDF",
-                pdf_buffer,
+                pdf_bytes,
                 "dashboard_report.pdf",
                 "application/pdf"
             )
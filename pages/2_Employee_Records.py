@@ -47,7 +47,7 @@ df_display.insert(0, "SR_No", range(1, len(df_display) + 1))
 st.subheader("🔍 Search Employee")
 search = st.text_input("Search by Name / Department / Role").lower()
 
-filtered_df = df_display.copy()
+filtered_df = df_display
 if search:
     filtered_df = filtered_df[
         filtered_df["Name"].str.lower().str.contains(search, na=False) |
@@ -49,8 +49,8 @@ with st.form("add_employee_form", clear_on_submit=True):
                 "Location": location
             }
             try:
-                db.add_employee(new_row)
-                st.success(f"✅ Employee {emp_name} added successfully!")
+                new_id = db.add_employee(new_row)
+                st.success(f"✅ Employee {emp_name} added successfully! (Emp_ID {new_id})")
             except Exception as e:
                 st.error("Failed to add employee.")
                 st.exception(e)
@@ -12,11 +12,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import plotly.express as px
-import io
 
 from utils import database as db
 from utils.auth import require_login, show_role_badge, logout_user
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
 from utils.analytics import department_distribution, gender_ratio, average_salary_by_dept
 
 st.set_page_config(page_title="Reports", page_icon="📊", layout="wide")
@@ -58,7 +57,7 @@ status_options = ["All"] + sorted(df_employees["Status"].dropna().unique().tolis
 dept_filter   = st.sidebar.selectbox("Department", dept_options)
 status_filter = st.sidebar.selectbox("Status", status_options)
 
-filtered_df = df_employees.copy()
+filtered_df = df_employees
 if dept_filter != "All":
     filtered_df = filtered_df[filtered_df["Department"] == dept_filter]
 if status_filter != "All":
@@ -82,17 +81,6 @@ c4.metric("🏢 Departments",      dept_count)
 
 st.divider()
 
-# ===========================
-# Helper: save matplotlib fig to PNG bytes
-# ===========================
-def fig_to_png(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    data = buf.read()
-    plt.close(fig)
-    return data
-
 # Storage for PDF figures
 pdf_figs = {}
 
@@ -341,10 +329,8 @@ st.divider()
 st.subheader("📄 Download Master Workforce PDF")
 
 if st.button("🖨️ Generate PDF Report"):
-    pdf_buffer = io.BytesIO()
     try:
-        generate_master_report(
-            buffer=pdf_buffer,
+        pdf_bytes = generate_master_report(
             employees_df=filtered_df,
             attendance_df=df_attendance,
             mood_df=df_mood,
@@ -355,10 +341,9 @@ if st.button("🖨️ Generate PDF Report"):
             mood_fig=pdf_figs.get("mood"),
             project_fig=pdf_figs.get("project"),
         )
-        pdf_buffer.seek(0)
         st.download_button(
             "⬇️ Download PDF",
-            pdf_buffer,
+            pdf_bytes,
             "workforce_report.pdf",
             "application/pdf"
         )
@@ -10,6 +10,8 @@ import matplotlib.pyplot as plt
 
 from utils import database as db
 from utils.auth import require_login, show_role_badge, logout_user
+from utils.mood import load_mood_frame, label_scores
+from utils.analytics import map_emp_names
 
 st.set_page_config(page_title="Mood Tracker", page_icon="😊", layout="wide")
 require_login()
@@ -72,6 +74,7 @@ with st.form("mood_survey_form", clear_on_submit=True):
                 mood_score=int(total_score),
                 remarks=f"{mood_label} | {remarks}"
             )
+            load_mood_frame.clear()
             st.success(f"Mood recorded: {mood_label} (Score: {total_score}/25)")
             st.rerun()
 
@@ -92,15 +95,12 @@ except Exception:
     mood_df = pd.DataFrame(columns=["emp_id","mood_score","remarks","log_date"])
 
 if not mood_df.empty:
-    emp_map = employees_df.set_index("Emp_ID")["Name"].to_dict()
-    mood_df["Employee"] = mood_df["emp_id"].map(emp_map).fillna(mood_df["emp_id"].astype(str))
+    mood_df["Employee"] = map_emp_names(mood_df["emp_id"], employees_df)
 
     mood_df["Score"] = pd.to_numeric(mood_df["mood_score"], errors="coerce")
     mood_df["Date"] = pd.to_datetime(mood_df["log_date"], errors="coerce")
 
-    mood_df["Mood"] = mood_df["Score"].apply(
-        lambda x: "😊 Happy" if x >= 20 else ("😐 Neutral" if x >= 13 else "😟 Stressed")
-    )
+    mood_df["Mood"] = label_scores(mood_df["Score"])
 
     mood_df_sorted = mood_df.sort_values("Date", ascending=False)
 
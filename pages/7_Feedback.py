@@ -9,13 +9,12 @@ Employee Feedback System (FINAL + PDF GRAPH FIXED)
 
 import streamlit as st
 import pandas as pd
-import io
 import matplotlib.pyplot as plt
 
 from utils.auth import require_login, show_role_badge, logout_user
 from utils import database as db
 from utils.analytics import feedback_summary
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
 
 # -------------------------
 # Authentication
@@ -172,11 +171,7 @@ if not feedback_df.empty:
         st.pyplot(fig)
 
         # ✅ convert to PNG for PDF
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-        buf.seek(0)
-        feedback_png = buf.read()
-        plt.close(fig)
+        feedback_png = fig_to_png(fig)
 
         st.dataframe(summary_df, use_container_width=True)
     else:
@@ -190,20 +185,17 @@ else:
 st.subheader("📄 Export Feedback Report")
 
 if st.button("Generate Feedback PDF"):
-    pdf_buffer = io.BytesIO()
     try:
-        generate_master_report(
-            buffer=pdf_buffer,
+        pdf_bytes = generate_master_report(
             employees_df=emp_df,
             notifications_df=feedback_df.rename(columns={"feedback_id": "id"}),
             notification_fig=feedback_png,  # ✅ GRAPH PASSED
             title="Employee Feedback Report"
         )
-        pdf_buffer.seek(0)
 
         st.download_button(
             "Download PDF",
-            pdf_buffer,
+            pdf_bytes,
             "feedback_report.pdf",
             "application/pdf"
         )
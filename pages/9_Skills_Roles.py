@@ -11,11 +11,12 @@ Employee Skill Inventory & Role Mapping (FINAL + PDF GRAPH)
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import io
 from utils.auth import require_login, show_role_badge, logout_user
 from utils import database as db
-from utils.pdf_export import generate_master_report
+from utils.pdf_export import generate_master_report, fig_to_png
+from utils.constants import ROLE_SKILLS, ROLE_EDIT_ROLES
 
 # -----------------------
 # Authentication
@@ -28,10 +29,12 @@ role = st.session_state.get("role", "Employee")
 st.title("🧰 Skill Inventory & Role Mapping")
 
 # -----------------------
-# Load Employees
+# Load Employees (db.fetch_employee_skills is cached and cleared by every mutator)
+# Categorical Department/Role/Status/Gender/Location → integer-coded groupby
+# SkillPairs: tuple of (skill, level) per employee, parsed in the cached loader
 # -----------------------
 try:
-    emp_df = db.fetch_employees()
+    emp_df = db.fetch_employee_skills()
 except Exception as e:
     st.error("❌ Failed to load employees.")
     st.exception(e)
@@ -41,65 +44,38 @@ if emp_df.empty:
     st.info("No employee data available.")
     st.stop()
 
-# -----------------------
-# Helper: Parse skills with scale
-# -----------------------
-def parse_skills(skill_str):
-    skills = []
-    if pd.isna(skill_str) or not str(skill_str).strip():
-        return skills
-
-    parts = str(skill_str).replace(",", ";").split(";")
-    for p in parts:
-        if ":" in p:
-            skill, level = p.split(":", 1)
-            try:
-                skills.append((skill.strip(), int(level.strip())))
-            except:
-                skills.append((skill.strip(), 1))
-        else:
-            skills.append((p.strip(), 1))
-    return skills
-
 # -----------------------
 # Sidebar Filters
 # -----------------------
 st.sidebar.header("Filters")
 
-dept_filter = st.sidebar.selectbox(
-    "Department",
-    ["All"] + sorted(emp_df["Department"].dropna().unique())
-)
-
-role_filter = st.sidebar.selectbox(
-    "Role",
-    ["All"] + sorted(emp_df["Role"].dropna().unique())
-)
+dept_options, role_options = db.employee_filter_options()
+dept_filter = st.sidebar.selectbox("Department", dept_options)
+role_filter = st.sidebar.selectbox("Role", role_options)
 
-filtered_df = emp_df.copy()
+# One combined boolean mask, one slice
+mask = np.ones(len(emp_df), dtype=bool)
 if dept_filter != "All":
-    filtered_df = filtered_df[filtered_df["Department"] == dept_filter]
+    mask &= emp_df["Department"].to_numpy() == dept_filter
 if role_filter != "All":
-    filtered_df = filtered_df[filtered_df["Role"] == role_filter]
+    mask &= emp_df["Role"].to_numpy() == role_filter
+
+filtered_df = emp_df.loc[mask]
 
 # -----------------------
 # Build Skill Table
 # -----------------------
-skill_rows = []
-
-for _, row in filtered_df.iterrows():
-    parsed = parse_skills(row["Skills"])
-    for skill, level in parsed:
-        skill_rows.append({
-            "Emp_ID": row["Emp_ID"],
-            "Name": row["Name"],
-            "Department": row["Department"],
-            "Role": row["Role"],
-            "Skill": skill,
-            "Level": level
-        })
+# Explode the cached SkillPairs: the same parse_skills() result
+# feeds this table and the role suggestions below
+def build_skill_table(df):
+    cols = ["Emp_ID", "Name", "Department", "Role"]
+    pairs = df[cols + ["SkillPairs"]].explode("SkillPairs").dropna(subset=["SkillPairs"])
+    if pairs.empty:
+        return pd.DataFrame(columns=cols + ["Skill", "Level"])
+    skills, levels = zip(*pairs["SkillPairs"])
+    return pairs[cols].assign(Skill=skills, Level=levels).reset_index(drop=True)
 
-skill_df = pd.DataFrame(skill_rows)
+skill_df = build_skill_table(filtered_df)
 
 st.subheader("👩‍💼 Employee Skill Inventory (Scaled)")
 st.dataframe(skill_df, use_container_width=True)
@@ -139,15 +115,11 @@ if not skill_df.empty:
     st.pyplot(fig)
 
     # ✅ Convert graph to PNG for PDF
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    skill_png = buf.read()
-    plt.close(fig)
+    skill_png = fig_to_png(fig)
 
     # Department-wise skill strength
     st.subheader("🏢 Department-wise Skill Strength")
-    dept_skill = skill_df.groupby(["Department", "Skill"])["Level"].mean().reset_index()
+    dept_skill = skill_df.groupby(["Department", "Skill"], observed=True)["Level"].mean().reset_index()
     st.dataframe(dept_skill, use_container_width=True)
 
 else:
@@ -158,35 +130,28 @@ else:
 # -----------------------
 st.subheader("🔄 Role Suggestions Based on Skills")
 
-emp_choice = st.selectbox(
+# Select by Emp_ID: the selection stays on the same employee across reruns
+# even when rows are added or removed; labels are display-only
+emp_ids = emp_df["Emp_ID"].tolist()
+emp_labels = emp_df["Emp_ID"].astype(str).str.cat(emp_df["Name"].astype(str), sep=" - ").tolist()
+emp_id = st.selectbox(
     "Select Employee",
-    emp_df["Emp_ID"].astype(str) + " - " + emp_df["Name"]
+    emp_ids,
+    format_func=dict(zip(emp_ids, emp_labels)).__getitem__
 )
 
-emp_id = int(emp_choice.split(" - ")[0])
-emp_row = emp_df[emp_df["Emp_ID"] == emp_id].iloc[0]
-parsed_skills = parse_skills(emp_row["Skills"])
+emp_row = emp_df.loc[emp_df["Emp_ID"] == emp_id].iloc[0]
 
 st.markdown(f"**Current Role:** {emp_row['Role']}")
 st.markdown(f"**Skills:** {emp_row['Skills']}")
 
-role_map = {
-    "Developer": ["Python", "Java", "JavaScript"],
-    "Data Analyst": ["Python", "SQL", "Excel"],
-    "Manager": ["Leadership", "Communication"],
-    "HR Executive": ["Communication", "Management"],
-    "Accountant": ["Excel", "Finance"],
-}
-
-suggested = []
+# Skills at level 3+ built once, then one set test per role
+strong_skills = {skill for skill, level in emp_row["SkillPairs"] if level >= 3}
 
-for role_name, req_skills in role_map.items():
-    match = 0
-    for skill, level in parsed_skills:
-        if skill in req_skills and level >= 3:
-            match += 1
-    if match >= 1:
-        suggested.append(role_name)
+suggested = [
+    role_name for role_name, req_skills in ROLE_SKILLS.items()
+    if not req_skills.isdisjoint(strong_skills)
+]
 
 if suggested:
     st.success("Suggested Roles: " + ", ".join(suggested))
@@ -196,7 +161,7 @@ else:
 # -----------------------
 # Update Role (Admin/HR)
 # -----------------------
-if role in ["Admin", "HR"]:
+if role in ROLE_EDIT_ROLES:
     st.subheader("✏️ Update Employee Role")
     new_role = st.text_input("New Role")
 
@@ -222,11 +187,9 @@ if st.button("Download Skills PDF"):
     if skill_png is None:
         st.error("No graph available to export.")
     else:
-        pdf_buffer = io.BytesIO()
         try:
-            generate_master_report(
-                buffer=pdf_buffer,
-                employees_df=emp_df,
+            pdf_bytes = generate_master_report(
+                employees_df=emp_df.drop(columns=["SkillPairs"]),
                 attendance_df=None,
                 mood_df=None,
                 projects_df=skill_df,
@@ -234,11 +197,10 @@ if st.button("Download Skills PDF"):
                 project_fig=skill_png  # 👈 graph in PDF
             )
 
-            pdf_buffer.seek(0)
 
             st.download_button(
                 "Download PDF",
-                pdf_buffer,
+                pdf_bytes,
                 "skills_report.pdf",
                 "application/pdf"
             )
@@ -2,9 +2,14 @@
 """
 Analytics Utilities — Workforce Intelligence System
 Handles summaries, trends, and options for employees, feedback, mood, tasks, and skills.
+Chart summaries are wrapped in st.cache_data; the cache key is a hash of the
+input frame's contents, so writes show up without explicit invalidation.
+Entries are bounded (ttl=60, max_entries=32) so stale snapshots are evicted.
 """
 
+import numpy as np
 import pandas as pd
+import streamlit as st
 from datetime import datetime
 
 # --------------------------
@@ -17,15 +22,46 @@ def get_summary(df: pd.DataFrame):
     if df is None or df.empty:
         return {"total": 0, "active": 0, "resigned": 0}
     
-    total = len(df)
-    active = int(len(df[df.get("Status", "") == "Active"])) if "Status" in df.columns else 0
-    resigned = int(len(df[df.get("Status", "") == "Resigned"])) if "Status" in df.columns else 0
-    return {"total": total, "active": active, "resigned": resigned}
+    if "Status" not in df.columns:
+        return {"total": len(df), "active": 0, "resigned": 0}
+
+    # One hash pass over Status for every count
+    vc = df["Status"].value_counts()
+    return {
+        "total": len(df),
+        "active": int(vc.get("Active", 0)),
+        "resigned": int(vc.get("Resigned", 0))
+    }
+
+
+# --------------------------
+# EMP_ID → NAME
+# --------------------------
+def map_emp_names(emp_ids: pd.Series, employee_df: pd.DataFrame, fallback=None) -> pd.Series:
+    """
+    Return employee names for a Series of emp_ids via a sorted searchsorted lookup.
+    Unmatched ids get `fallback`, or the id as a string when fallback is None.
+    """
+    keys = emp_ids.to_numpy()
+    fill = emp_ids.astype(str).to_numpy() if fallback is None else fallback
+    if employee_df is None or employee_df.empty:
+        return pd.Series(fill, index=emp_ids.index, dtype=object)
+
+    ids = employee_df["Emp_ID"].to_numpy()
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    names = employee_df["Name"].to_numpy()[order]
+
+    idx = np.searchsorted(ids, keys).clip(max=len(ids) - 1)
+    found = names[idx]
+    hit = (ids[idx] == keys) & pd.notna(found)
+    return pd.Series(np.where(hit, found, fill), index=emp_ids.index, dtype=object)
 
 
 # --------------------------
 # DEPARTMENT DISTRIBUTION
 # --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
 def department_distribution(df: pd.DataFrame, active_only=True) -> pd.Series:
     """
     Return count of employees per department.
@@ -41,6 +77,7 @@ def department_distribution(df: pd.DataFrame, active_only=True) -> pd.Series:
 # --------------------------
 # GENDER RATIO
 # --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
 def gender_ratio(df: pd.DataFrame, active_only=True) -> pd.Series:
     """
     Return count of Male/Female employees.
@@ -55,6 +92,7 @@ def gender_ratio(df: pd.DataFrame, active_only=True) -> pd.Series:
 # --------------------------
 # AVERAGE SALARY BY DEPARTMENT
 # --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
 def average_salary_by_dept(df: pd.DataFrame, active_only=True) -> pd.Series:
     """
     Return mean salary per department, descending order.
@@ -69,6 +107,7 @@ def average_salary_by_dept(df: pd.DataFrame, active_only=True) -> pd.Series:
 # --------------------------
 # FEEDBACK SUMMARY
 # --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
 def feedback_summary(feedback_df: pd.DataFrame, employee_df: pd.DataFrame):
     """
     Return feedback summary: Avg Rating & Feedback Count per employee.
@@ -81,7 +120,8 @@ def feedback_summary(feedback_df: pd.DataFrame, employee_df: pd.DataFrame):
         Feedback_Count=("rating", "count")
     ).reset_index()
     
-    emp_map = employee_df.set_index("Emp_ID")["Name"].to_dict()
+    # Lookup built from the two needed columns only (set_index copies the frame)
+    emp_map = pd.Series(employee_df["Name"].to_numpy(), index=employee_df["Emp_ID"].to_numpy())
     summary["Employee"] = summary["receiver_id"].map(emp_map).fillna("Unknown")
     summary = summary[["Employee", "Avg_Rating", "Feedback_Count"]]
     return summary
@@ -99,17 +139,26 @@ def mood_trend(df: pd.DataFrame, freq="W"):
     if df is None or df.empty or "log_date" not in df.columns or "mood" not in df.columns:
         return pd.DataFrame(columns=["Period", "Mood", "Count"])
     
-    df = df.copy()
-    df["log_date"] = pd.to_datetime(df["log_date"], errors="coerce")
-    df["Period"] = df["log_date"].dt.to_period(freq).astype(str)
-    
-    trend = df.groupby(["Period", "mood"]).size().reset_index(name="Count")
+    # Group on the Period dtype directly; stringify only the aggregated axis
+    period = pd.to_datetime(df["log_date"], errors="coerce").dt.to_period(freq).rename("Period")
+    trend = df.groupby([period, df["mood"]]).size().reset_index(name="Count")
+    trend["Period"] = trend["Period"].astype(str)
     return trend
 
 
 # --------------------------
 # TASK SUMMARY
 # --------------------------
+def _column_or(df: pd.DataFrame, col: str, default) -> pd.Series:
+    """
+    Return df[col] with gaps filled by default, or a constant Series
+    when the column is missing. Never copies the whole frame.
+    """
+    if col in df.columns:
+        return df[col].fillna(default)
+    return pd.Series(default, index=df.index, name=col)
+
+
 def task_summary(task_df: pd.DataFrame):
     """
     Return task counts by status and priority.
@@ -117,10 +166,9 @@ def task_summary(task_df: pd.DataFrame):
     if task_df is None or task_df.empty:
         return pd.DataFrame(columns=["Status", "Priority", "Count"])
     
-    df = task_df.copy()
-    df["status"] = df.get("status", "Unknown")
-    df["priority"] = df.get("priority", "Normal")
-    summary = df.groupby(["status", "priority"]).size().reset_index(name="Count")
+    status = _column_or(task_df, "status", "Unknown")
+    priority = _column_or(task_df, "priority", "Normal")
+    summary = task_df.groupby([status, priority]).size().reset_index(name="Count")
     return summary
 
 
@@ -133,7 +181,7 @@ def employee_options(df: pd.DataFrame):
     """
     if df is None or df.empty or "Emp_ID" not in df.columns or "Name" not in df.columns:
         return []
-    return (df["Emp_ID"].astype(str) + " - " + df["Name"]).tolist()
+    return [f"{i} - {n}" for i, n in zip(df["Emp_ID"].to_numpy(), df["Name"].to_numpy())]
 
 
 # --------------------------
@@ -169,5 +217,5 @@ def skill_options(df: pd.DataFrame):
     """
     if df is None or df.empty or "Skills" not in df.columns:
         return []
-    all_skills = df["Skills"].dropna().str.replace(";", ",").str.split(",").explode().str.strip()
-    return sorted(all_skills.unique())
+    all_skills = df["Skills"].dropna().str.replace(";", ",", regex=False).str.split(",").explode().str.strip()
+    return np.unique(all_skills.dropna().to_numpy(dtype=str)).tolist()
@@ -7,14 +7,9 @@ Authentication & Authorization utilities
 """
 
 import streamlit as st
-import hashlib
 from utils import database as db
-
-# -------------------------
-# Password Hashing
-# -------------------------
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+from utils.database import hash_password  # single canonical implementation
+from utils.constants import ROLE_EDIT_ROLES
 
 # -------------------------
 # Login Logic
@@ -28,10 +23,13 @@ def login(username: str, password: str):
     if not user:
         return False, "User not found"
 
-    hashed_input = hash_password(password)
-    if hashed_input != user["password"]:
+    if not db.verify_password(password, user["password"]):
         return False, "Invalid password"
 
+    # Lazy migration of SHA-256 / BLAKE2b rows (or low-cost bcrypt) to the current hash
+    if db.needs_rehash(user["password"]):
+        db.update_user_password(user["id"], hash_password(password))
+
     st.session_state.clear()
     st.session_state["logged_in"] = True
     st.session_state["user"]      = user["username"]
@@ -89,12 +87,21 @@ def show_role_badge():
         st.sidebar.markdown(f"🧑‍💼 **Role:** `{role}`")
 
     # ── CSV Import shortcut on every page (Admin/HR) ──────────
-    if role in ["Admin", "HR"]:
+    if role in ROLE_EDIT_ROLES:
         st.sidebar.divider()
         st.sidebar.markdown("### 📥 Import CSV")
 
+        # Result of the last import, carried across its st.rerun()
+        import_result = st.session_state.pop("auth_import_result", None)
+        if import_result:
+            ok, skipped = import_result
+            st.sidebar.success(f"✅ {ok} employees imported!")
+            if skipped:
+                st.sidebar.warning(f"⚠️ {skipped} rows skipped due to errors.")
+
+        # Heavy imports only for Admin/HR sessions that render the importer
         import pandas as pd
-        import datetime
+        from datetime import date
 
         with st.sidebar.expander("Upload Employee CSV", expanded=False):
             st.caption("Columns: Name, Age, Gender, Department, Role, Skills, Join_Date, Status, Salary, Location")
@@ -135,7 +142,7 @@ def show_role_badge():
                         # Fill defaults
                         for col, default in [("Age",30),("Gender","Male"),
                                              ("Skills","Excel:3"),
-                                             ("Join_Date", datetime.date.today().strftime("%Y-%m-%d")),
+                                             ("Join_Date", date.today().isoformat()),
                                              ("Resign_Date",""),("Salary",50000),("Location","Unknown")]:
                             if col not in csv_df.columns:
                                 csv_df[col] = default
@@ -145,26 +152,10 @@ def show_role_badge():
                         st.caption(f"{len(csv_df)} rows ready to import")
 
                         if st.button("✅ Confirm Import", use_container_width=True, key="auth_confirm_import"):
-                            ok = 0
-                            for _, row in csv_df.iterrows():
-                                try:
-                                    db.add_employee({
-                                        "Name":        str(row["Name"]),
-                                        "Age":         int(row["Age"]),
-                                        "Gender":      str(row["Gender"]),
-                                        "Department":  str(row["Department"]),
-                                        "Role":        str(row["Role"]),
-                                        "Skills":      str(row["Skills"]),
-                                        "Join_Date":   str(row["Join_Date"]),
-                                        "Resign_Date": str(row["Resign_Date"]),
-                                        "Status":      str(row["Status"]),
-                                        "Salary":      float(row["Salary"]),
-                                        "Location":    str(row["Location"]),
-                                    })
-                                    ok += 1
-                                except Exception:
-                                    pass
-                            st.success(f"✅ {ok} employees imported!")
+                            ok = db.add_employees_bulk(csv_df)
+                            # add_employees_bulk clears the employee caches; keep the
+                            # result across the rerun so the message is not lost
+                            st.session_state["auth_import_result"] = (ok, len(csv_df) - ok)
                             st.rerun()
                 except Exception as e:
                     st.error(f"Error reading CSV: {e}")
\ No newline at end of file
@@ -0,0 +1,39 @@
+# utils/constants.py
+"""
+Shared constants for Workforce Intelligence System
+- Streamlit re-executes page scripts on every rerun, so lookup tables defined
+  inside a page are rebuilt on each interaction. Modules under utils/ are
+  imported once per process, so static maps live here instead.
+"""
+
+# --------------------------
+# Access Control
+# --------------------------
+ALLOWED_PDF_ROLES = frozenset({"Admin", "Manager", "HR"})
+ROLE_EDIT_ROLES   = frozenset({"Admin", "HR"})
+
+
+# --------------------------
+# Mood
+# --------------------------
+MOOD_SCORE = {"😊 Happy": 3, "😐 Neutral": 2, "😟 Stressed": 1}
+
+MOOD_COLORS = {
+    "😊 Happy":    "#22c55e",
+    "😐 Neutral":  "#f59e0b",
+    "😟 Stressed": "#ef4444",
+}
+
+
+# --------------------------
+# Skills → Roles
+# --------------------------
+ROLE_MAP = {
+    "Developer":    ["Python", "Java", "JavaScript"],
+    "Data Analyst": ["Python", "SQL", "Excel"],
+    "Manager":      ["Leadership", "Communication"],
+    "HR Executive": ["Communication", "Management"],
+    "Accountant":   ["Excel", "Finance"],
+}
+
+ROLE_SKILLS = {r: frozenset(v) for r, v in ROLE_MAP.items()}
@@ -4,12 +4,18 @@ Database utilities for Workforce Intelligence System
 - SQLite backend
 - Tables: users, employees, tasks, mood_logs, feedback, attendance, notifications, projects
 - FULL CRUD + all missing functions fixed
+- Read-mostly fetch_* results cached with st.cache_data; mutators clear them
 """
 
+import os
+import hmac
 import sqlite3
 import pandas as pd
 import hashlib
-from datetime import datetime
+import bcrypt
+import streamlit as st
+import time
+import threading
 
 DB_NAME = "workforce.db"
 
@@ -17,23 +23,123 @@ DB_NAME = "workforce.db"
 # --------------------------
 # DB Connection
 # --------------------------
+# One connection per thread instead of a connect/close per helper call.
+# Streamlit runs each session's script on its own thread, and sqlite3
+# transactions belong to the connection, so a shared handle would let one
+# session's commit() flush another's half-finished writes. WAL lets readers
+# proceed during a write; callers still commit() as before but must not
+# close() the handle.
+_local = threading.local()
+
+
 def connect_db():
-    return sqlite3.connect(DB_NAME, check_same_thread=False)
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    # Every table exists before any helper runs, so fetch_* need no guards
+    # (a no-op user_version check once the schema is current)
+    _create_schema(conn)
+    _local.conn = conn
+    return conn
+
+
+TIMESTAMP_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _now() -> str:
+    # time.strftime skips building a datetime object per insert
+    return time.strftime(TIMESTAMP_FMT)
 
 
 # --------------------------
 # Password Hashing
 # --------------------------
+# New hashes: bcrypt ("$2b$..."), cost from BCRYPT_ROUNDS (default 12).
+# Older rows are keyed BLAKE2b ("blake2b$<hex>", key from AUTH_SECRET) or
+# bare SHA-256 hex; both still verify and are re-hashed on login.
+_sha256 = hashlib.sha256
+_blake2b = hashlib.blake2b
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+BLAKE2B_PREFIX = "blake2b$"
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+_secret = os.environ.get("AUTH_SECRET", "").encode("utf-8")
+_AUTH_KEY = _secret if len(_secret) <= 64 else _blake2b(_secret).digest()
+
+
+def _bcrypt_input(password: str) -> bytes:
+    # bcrypt only reads the first 72 bytes; newer releases raise instead of truncating
+    return password.encode("utf-8")[:72]
+
+
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_bcrypt_input(password), salt).decode("ascii")
+
+
+def _digest_matches(digest: bytes, stored_hex: str) -> bool:
+    # Compare raw digests in constant time; no hex encoding of the fresh digest
+    try:
+        expected = bytes.fromhex(stored_hex)
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
+def _verify_blake2b(password: str, stored: str) -> bool:
+    digest = _blake2b(password.encode("utf-8"), digest_size=32, key=_AUTH_KEY).digest()
+    return _digest_matches(digest, stored[len(BLAKE2B_PREFIX):])
+
+
+def _verify_sha(password: str, stored_hex: str) -> bool:
+    return _digest_matches(_sha256(password.encode("utf-8")).digest(), stored_hex)
+
+
+def verify_password(password: str, stored: str) -> bool:
+    if stored.startswith(BCRYPT_PREFIXES):
+        try:
+            return bcrypt.checkpw(_bcrypt_input(password), stored.encode("ascii"))
+        except ValueError:
+            return False
+    if stored.startswith(BLAKE2B_PREFIX):
+        return _verify_blake2b(password, stored)
+    return _verify_sha(password, stored)
+
+
+def needs_rehash(stored: str) -> bool:
+    if not stored.startswith(BCRYPT_PREFIXES):
+        return True
+    # Re-hash when BCRYPT_ROUNDS has been raised since the row was written
+    try:
+        return int(stored[4:6]) < BCRYPT_ROUNDS
+    except ValueError:
+        return True
 
 
 # --------------------------
 # Initialize All Tables
 # --------------------------
 def initialize_all_tables():
-    conn = connect_db()
+    # Schema is created (once per database) when a connection is first opened
+    connect_db()
+
+
+# Bump when the DDL below changes so existing databases re-run it once
+SCHEMA_VERSION = 2
+
+
+def _create_schema(conn):
     cur = conn.cursor()
+    if cur.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+
+    cur.execute("BEGIN IMMEDIATE")
 
     cur.execute("""
     CREATE TABLE IF NOT EXISTS users (
@@ -130,21 +236,39 @@ def initialize_all_tables():
     )
     """)
 
+    # Databases created before employees.user_id existed get the column added
+    emp_cols = {row[1] for row in cur.execute("PRAGMA table_info(employees)")}
+    if "user_id" not in emp_cols:
+        cur.execute("ALTER TABLE employees ADD COLUMN user_id INTEGER")
+
+    # Lookup indexes (users.username is already indexed by its UNIQUE constraint).
+    # notifications is ordered by created_at DESC per employee, so that index
+    # serves the ORDER BY without a sort step.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_emp_user ON employees(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_emp ON tasks(emp_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_mood_emp ON mood_logs(emp_id, log_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_feedback_receiver ON feedback(receiver_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_emp ON attendance(emp_id, date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_notif_emp_created ON notifications(emp_id, created_at DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_notif_created ON notifications(created_at DESC)")
+
+    cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
-    conn.close()
 
 
 # --------------------------
 # AUTH
 # --------------------------
 def get_user_by_username(username: str):
-    conn = connect_db()
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE username=?", (username,))
+    cur = connect_db().cursor()
+    cur.execute(
+        "SELECT id, username, password, role FROM users WHERE username=? LIMIT 1",
+        (username,)
+    )
     row = cur.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    if not row:
+        return None
+    return {"id": row[0], "username": row[1], "password": row[2], "role": row[3]}
 
 
 def create_default_admin():
@@ -160,15 +284,20 @@ def create_default_admin():
         )
 
     conn.commit()
-    conn.close()
+
+
+def update_user_password(user_id: int, hashed: str):
+    conn = connect_db()
+    cur = conn.cursor()
+    cur.execute("UPDATE users SET password=? WHERE id=?", (hashed, user_id))
+    conn.commit()
 
 
 def get_emp_id_by_user_id(user_id: int):
     conn = connect_db()
     cur = conn.cursor()
-    cur.execute("SELECT Emp_ID FROM employees WHERE user_id=?", (user_id,))
+    cur.execute("SELECT Emp_ID FROM employees WHERE user_id=? LIMIT 1", (user_id,))
     row = cur.fetchone()
-    conn.close()
     return row[0] if row else None
 
 
@@ -182,6 +311,7 @@ def add_employee(emp: dict):
         INSERT INTO employees
         (Name, Age, Gender, Department, Role, Skills, Join_Date, Resign_Date, Status, Salary, Location)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING Emp_ID
     """, (
         emp.get("Name"),
         emp.get("Age"),
@@ -195,29 +325,156 @@ def add_employee(emp: dict):
         emp.get("Salary", 0),
         emp.get("Location", "")
     ))
+    new_id = cur.fetchone()[0]
+    conn.commit()
+    _clear_employee_caches()
+    return new_id
+
+
+EMPLOYEE_COLS = [
+    "Name", "Age", "Gender", "Department", "Role", "Skills",
+    "Join_Date", "Resign_Date", "Status", "Salary", "Location"
+]
+EMPLOYEE_UPDATE_COLS = EMPLOYEE_COLS + ["user_id"]
+
+
+def add_employees_bulk(df: pd.DataFrame) -> int:
+    """
+    Insert many employees with one executemany in a single transaction.
+    Types are coerced per column; rows whose Age or Salary is not numeric
+    are skipped. Returns the number of rows inserted.
+    """
+    if df is None or df.empty:
+        return 0
+
+    df = df.reindex(columns=EMPLOYEE_COLS)
+    df = df.fillna({"Resign_Date": "", "Status": "Active", "Salary": 0, "Location": ""})
+    age = pd.to_numeric(df["Age"], errors="coerce")
+    salary = pd.to_numeric(df["Salary"], errors="coerce")
+    valid = age.notna() & salary.notna()
+
+    text_cols = [c for c in EMPLOYEE_COLS if c not in ("Age", "Salary")]
+    df = df.loc[valid, text_cols].astype(str).assign(
+        Age=age[valid].astype(int),
+        Salary=salary[valid].astype(float)
+    )[EMPLOYEE_COLS]
+
+    conn = connect_db()
+    cur = conn.cursor()
+    cur.executemany("""
+        INSERT INTO employees
+        (Name, Age, Gender, Department, Role, Skills, Join_Date, Resign_Date, Status, Salary, Location)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, df.itertuples(index=False, name=None))
     conn.commit()
-    conn.close()
+    _clear_employee_caches()
+    return len(df)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_employees():
     conn = connect_db()
-    try:
-        df = pd.read_sql("SELECT * FROM employees", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    df = pd.read_sql("SELECT * FROM employees", conn)
+    return df
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def employee_filter_options():
+    """
+    Sidebar choices for the employee filters: ("All", *sorted departments)
+    and ("All", *sorted roles). Cleared together with fetch_employees.
+    """
+    df = fetch_employees()
+    return tuple(
+        ["All"] + sorted(df[col].dropna().unique().tolist()) if col in df.columns else ["All"]
+        for col in ("Department", "Role")
+    )
+
+
+def _clear_employee_caches():
+    fetch_employees.clear()
+    employee_filter_options.clear()
+    fetch_employee_skills.clear()
+
+
+EMPLOYEE_CATEGORY_COLS = ("Department", "Role", "Status", "Gender", "Location")
+
+
+def fetch_employees_optimized():
+    """
+    Read-only employee snapshot with compact dtypes.
+    Low-cardinality text columns become `category` and Emp_ID is downcast,
+    which shrinks the frame and speeds up isin / groupby / value_counts.
+    Do not write new labels into the category columns of the result.
+    """
+    df = fetch_employees()
+    if df.empty:
+        return df
+    for col in EMPLOYEE_CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    df["Emp_ID"] = pd.to_numeric(df["Emp_ID"], downcast="integer")
     return df
 
 
+def parse_skills(skill_str):
+    """
+    Parse "Python:4;SQL:3" (or comma-separated) into [(skill, level), ...].
+    Tokens without a usable level default to level 1.
+    """
+    skills = []
+    if pd.isna(skill_str) or not str(skill_str).strip():
+        return skills
+
+    parts = str(skill_str).replace(",", ";").split(";")
+    for p in parts:
+        if ":" in p:
+            skill, level = p.split(":", 1)
+            try:
+                skills.append((skill.strip(), int(level.strip())))
+            except ValueError:
+                skills.append((skill.strip(), 1))
+        else:
+            skills.append((p.strip(), 1))
+    return skills
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_employee_skills():
+    """
+    fetch_employees_optimized() plus a SkillPairs column holding the
+    parse_skills() result of each row as a tuple. Parsed once per employee
+    snapshot; cleared together with fetch_employees.
+    """
+    df = fetch_employees_optimized()
+    if not df.empty:
+        df["SkillPairs"] = df["Skills"].map(lambda s: tuple(parse_skills(s)))
+    return df
+
+
+def _set_clause(updates: dict, allowed):
+    """
+    Return (SET clause, values) for an UPDATE. Column names cannot be bound
+    as parameters, so only names in `allowed` are interpolated, and always in
+    `allowed` order: the same set of keys yields the same SQL text whatever
+    the dict order, so sqlite3's statement cache reuses the compiled UPDATE.
+    """
+    unknown = updates.keys() - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown column(s): {sorted(unknown)}")
+    cols = [col for col in allowed if col in updates]
+    return ", ".join(f"{col}=?" for col in cols), [updates[col] for col in cols]
+
+
 def update_employee(emp_id: int, updates: dict):
     if not updates:
         return
+    sets, values = _set_clause(updates, EMPLOYEE_UPDATE_COLS)
     conn = connect_db()
     cur = conn.cursor()
-    for key, val in updates.items():
-        cur.execute(f"UPDATE employees SET {key}=? WHERE Emp_ID=?", (val, emp_id))
+    cur.execute(f"UPDATE employees SET {sets} WHERE Emp_ID=?", (*values, emp_id))
     conn.commit()
-    conn.close()
+    _clear_employee_caches()
 
 
 def delete_employee(emp_id: int):
@@ -225,7 +482,7 @@ def delete_employee(emp_id: int):
     cur = conn.cursor()
     cur.execute("DELETE FROM employees WHERE Emp_ID=?", (emp_id,))
     conn.commit()
-    conn.close()
+    _clear_employee_caches()
 
 
 # --------------------------
@@ -238,6 +495,7 @@ def add_task(task: dict):
         INSERT INTO tasks
         (task_name, emp_id, assigned_by, due_date, priority, status, remarks)
         VALUES (?, ?, ?, ?, ?, ?, ?)
+        RETURNING task_id
     """, (
         task["task_name"],
         task["emp_id"],
@@ -247,27 +505,31 @@ def add_task(task: dict):
         task["status"],
         task["remarks"]
     ))
+    new_id = cur.fetchone()[0]
     conn.commit()
-    conn.close()
+    fetch_tasks.clear()
+    return new_id
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_tasks():
     conn = connect_db()
-    try:
-        df = pd.read_sql("SELECT * FROM tasks", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    df = pd.read_sql("SELECT * FROM tasks", conn)
     return df
 
 
+TASK_COLS = ["task_name", "emp_id", "assigned_by", "due_date", "priority", "status", "remarks"]
+
+
 def update_task(task_id: int, updates: dict):
+    if not updates:
+        return
+    sets, values = _set_clause(updates, TASK_COLS)
     conn = connect_db()
     cur = conn.cursor()
-    for key, val in updates.items():
-        cur.execute(f"UPDATE tasks SET {key}=? WHERE task_id=?", (val, task_id))
+    cur.execute(f"UPDATE tasks SET {sets} WHERE task_id=?", (*values, task_id))
     conn.commit()
-    conn.close()
+    fetch_tasks.clear()
 
 
 def delete_task(task_id: int):
@@ -275,7 +537,7 @@ def delete_task(task_id: int):
     cur = conn.cursor()
     cur.execute("DELETE FROM tasks WHERE task_id=?", (task_id,))
     conn.commit()
-    conn.close()
+    fetch_tasks.clear()
 
 
 # --------------------------
@@ -285,20 +547,19 @@ def add_mood_entry(emp_id: int, mood_score: int, remarks=""):
     conn = connect_db()
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO mood_logs (emp_id, mood_score, remarks, log_date) VALUES (?,?,?,?)",
-        (emp_id, mood_score, remarks, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        "INSERT INTO mood_logs (emp_id, mood_score, remarks, log_date) VALUES (?,?,?,?) RETURNING mood_id",
+        (emp_id, mood_score, remarks, _now())
     )
+    new_id = cur.fetchone()[0]
     conn.commit()
-    conn.close()
+    fetch_mood_logs.clear()
+    return new_id
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_mood_logs():
     conn = connect_db()
-    try:
-        df = pd.read_sql("SELECT * FROM mood_logs", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    df = pd.read_sql("SELECT * FROM mood_logs", conn)
     return df
 
 
@@ -310,19 +571,16 @@ def add_feedback(sender_id, receiver_id, message, rating):
     cur = conn.cursor()
     cur.execute(
         "INSERT INTO feedback (sender_id, receiver_id, message, rating, log_date) VALUES (?,?,?,?,?)",
-        (sender_id, receiver_id, message, rating, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        (sender_id, receiver_id, message, rating, _now())
     )
     conn.commit()
-    conn.close()
+    fetch_feedback.clear()
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_feedback():
     conn = connect_db()
-    try:
-        df = pd.read_sql("SELECT * FROM feedback", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    df = pd.read_sql("SELECT * FROM feedback", conn)
     return df
 
 
@@ -334,7 +592,7 @@ def update_feedback(feedback_id, message, rating):
         (message, rating, feedback_id)
     )
     conn.commit()
-    conn.close()
+    fetch_feedback.clear()
 
 
 def delete_feedback(feedback_id):
@@ -342,7 +600,7 @@ def delete_feedback(feedback_id):
     cur = conn.cursor()
     cur.execute("DELETE FROM feedback WHERE feedback_id=?", (feedback_id,))
     conn.commit()
-    conn.close()
+    fetch_feedback.clear()
 
 
 # --------------------------
@@ -356,19 +614,47 @@ def add_attendance(emp_id, date, check_in, check_out, status):
         (emp_id, date, check_in, check_out, status)
     )
     conn.commit()
-    conn.close()
 
 
-def fetch_attendance(emp_id=None):
+ATTENDANCE_COLS = ["emp_id", "date", "check_in", "check_out", "status"]
+
+
+def bulk_add_attendance(df: pd.DataFrame) -> int:
+    """
+    Insert many attendance rows with one executemany in a single transaction.
+    emp_id is cast once per column; rows without a numeric emp_id are
+    skipped. Returns the number of rows inserted.
+    """
+    if df is None or df.empty:
+        return 0
+
+    emp_id = pd.to_numeric(df["emp_id"], errors="coerce")
+    valid = emp_id.notna()
+    text_cols = ATTENDANCE_COLS[1:]
+    df = df.loc[valid, text_cols].fillna("").astype(str).assign(
+        emp_id=emp_id[valid].astype("int64")
+    )[ATTENDANCE_COLS]
+
     conn = connect_db()
-    try:
-        if emp_id:
-            df = pd.read_sql("SELECT * FROM attendance WHERE emp_id=?", conn, params=(emp_id,))
-        else:
-            df = pd.read_sql("SELECT * FROM attendance", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO attendance (emp_id, date, check_in, check_out, status) VALUES (?,?,?,?,?)",
+        df.itertuples(index=False, name=None)
+    )
+    conn.commit()
+    return len(df)
+
+
+def fetch_attendance(emp_id=None):
+    # Known schema: build the frame straight from the cursor rows
+    cols = ["attendance_id"] + ATTENDANCE_COLS
+    sql = f"SELECT {', '.join(cols)} FROM attendance"
+    cur = connect_db().cursor()
+    if emp_id:
+        cur.execute(sql + " WHERE emp_id=?", (emp_id,))
+    else:
+        cur.execute(sql)
+    df = pd.DataFrame.from_records(cur.fetchall(), columns=cols)
     return df
 
 
@@ -379,31 +665,42 @@ def add_notification(emp_id, message, notif_type="General"):
     conn = connect_db()
     cur = conn.cursor()
     cur.execute(
+        "INSERT INTO notifications (emp_id,message,type,created_at) VALUES (?,?,?,?) RETURNING notif_id",
+        (emp_id, message, notif_type, _now())
+    )
+    new_id = cur.fetchone()[0]
+    conn.commit()
+    return new_id
+
+
+def add_notifications_bulk(items) -> int:
+    """
+    Insert many (emp_id, message, type) notifications with one executemany,
+    all stamped with the same created_at. Use instead of looping
+    add_notification (e.g. "notify all employees"). Returns the row count.
+    """
+    now = _now()
+    rows = [(emp_id, message, notif_type, now) for emp_id, message, notif_type in items]
+    if not rows:
+        return 0
+    conn = connect_db()
+    cur = conn.cursor()
+    cur.executemany(
         "INSERT INTO notifications (emp_id,message,type,created_at) VALUES (?,?,?,?)",
-        (emp_id, message, notif_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        rows
     )
     conn.commit()
-    conn.close()
+    return len(rows)
 
 
 def fetch_notifications(emp_id=None):
+    # Both shapes read in index order (idx_notif_emp_created / idx_notif_created),
+    # so ORDER BY needs no sort step
+    sql = "SELECT notif_id AS id, emp_id, message, type, is_read, created_at FROM notifications"
     conn = connect_db()
-    try:
-        if emp_id:
-            df = pd.read_sql(
-                "SELECT notif_id AS id, emp_id, message, type, is_read, created_at FROM notifications WHERE emp_id=? ORDER BY created_at DESC",
-                conn,
-                params=(emp_id,)
-            )
-        else:
-            df = pd.read_sql(
-                "SELECT notif_id AS id, emp_id, message, type, is_read, created_at FROM notifications ORDER BY created_at DESC",
-                conn
-            )
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
-    return df
+    if emp_id:
+        return pd.read_sql(sql + " WHERE emp_id=? ORDER BY created_at DESC", conn, params=(emp_id,))
+    return pd.read_sql(sql + " ORDER BY created_at DESC", conn)
 
 
 def mark_notification_read(notif_id):
@@ -411,7 +708,6 @@ def mark_notification_read(notif_id):
     cur = conn.cursor()
     cur.execute("UPDATE notifications SET is_read=1 WHERE notif_id=?", (notif_id,))
     conn.commit()
-    conn.close()
 
 
 def delete_notification(notif_id):
@@ -419,17 +715,13 @@ def delete_notification(notif_id):
     cur = conn.cursor()
     cur.execute("DELETE FROM notifications WHERE notif_id=?", (notif_id,))
     conn.commit()
-    conn.close()
 
 
 # --------------------------
 # PROJECTS
 # --------------------------
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_projects():
     conn = connect_db()
-    try:
-        df = pd.read_sql("SELECT * FROM projects", conn)
-    except Exception:
-        df = pd.DataFrame()
-    conn.close()
+    df = pd.read_sql("SELECT * FROM projects", conn)
     return df
@@ -0,0 +1,187 @@
+# utils/mood.py
+"""
+Mood Utilities — Workforce Intelligence System
+- Shared load / label / filter / aggregate steps for mood pages
+- Cached with st.cache_data so reruns with unchanged inputs skip the work;
+  frame-keyed caches are bounded (ttl=60, max_entries=32) since every new
+  filter combination adds an entry
+- Plotly figures cached as JSON, keyed on the small aggregated frames
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils import database as db
+from utils.analytics import map_emp_names
+from utils.constants import MOOD_SCORE, MOOD_COLORS
+
+
+# --------------------------
+# SCORE → LABEL
+# --------------------------
+def label_scores(scores: pd.Series) -> np.ndarray:
+    """
+    Map survey totals (5–25) to mood labels in one vectorized pass.
+    Unparseable scores fall back to Neutral.
+    """
+    s = pd.to_numeric(scores, errors="coerce")
+    return np.select(
+        [s >= 20, s >= 13, s.notna()],
+        ["😊 Happy", "😐 Neutral", "😟 Stressed"],
+        default="😐 Neutral"
+    )
+
+
+# --------------------------
+# LOAD
+# --------------------------
+@st.cache_data(ttl=60, show_spinner=False)
+def load_mood_frame():
+    """
+    Return mood logs joined to employee names, with parsed dates,
+    mood label and numeric MoodScore. Rows without a valid date are dropped
+    and the result is sorted newest-first, so filtered views keep that order.
+    """
+    mood_df = db.fetch_mood_logs()
+    if mood_df.empty:
+        return mood_df
+
+    emp_df = db.fetch_employees()
+
+    mood_df["Employee"]   = map_emp_names(mood_df["emp_id"], emp_df, fallback="Unknown")
+    mood_df["DateTime"]   = pd.to_datetime(mood_df["log_date"], errors="coerce")
+    mood_df["date"]       = mood_df["DateTime"].dt.date
+    mood_df["mood_label"] = label_scores(mood_df["mood_score"])
+    mood_df["MoodScore"]  = mood_df["mood_label"].map(MOOD_SCORE)
+
+    mood_df = mood_df.dropna(subset=["date"])
+    return mood_df.sort_values("DateTime", ascending=False, ignore_index=True)
+
+
+# --------------------------
+# FILTER
+# --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def score_and_filter(mood_df: pd.DataFrame, user, start, end):
+    """
+    Filter a frame from load_mood_frame() by employee ("All" = everyone)
+    and inclusive date range.
+    """
+    mask = (mood_df["date"] >= start) & (mood_df["date"] <= end)
+    if user != "All":
+        mask &= mood_df["Employee"] == user
+    return mood_df[mask]
+
+
+# --------------------------
+# AGGREGATE
+# --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def aggregate_trends(filtered: pd.DataFrame):
+    """
+    Return (trend_df, mood_counts, emp_avg):
+    - trend_df: average MoodScore per date
+    - mood_counts: log count per mood label
+    - emp_avg: average MoodScore per employee, ascending
+    """
+    trend_df = (
+        filtered.groupby("date")["MoodScore"]
+        .mean()
+        .reset_index()
+        .rename(columns={"MoodScore": "avg_mood"})
+    )
+    mood_counts = filtered["mood_label"].value_counts()
+    emp_avg = (
+        filtered.groupby("Employee")["MoodScore"]
+        .mean()
+        .reset_index()
+        .rename(columns={"MoodScore": "Avg_Mood"})
+        .sort_values("Avg_Mood")
+    )
+    return trend_df, mood_counts, emp_avg
+
+
+# --------------------------
+# FIGURES (JSON, render with plotly.io.from_json)
+# --------------------------
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def trend_fig_json(trend_df: pd.DataFrame) -> str:
+    fig = px.line(
+        trend_df, x="date", y="avg_mood", markers=True,
+        title="Average Mood Score Over Time",
+        labels={"avg_mood": "Avg Mood (1=Stressed, 3=Happy)", "date": "Date"},
+        color_discrete_sequence=["#667eea"]
+    )
+    fig.update_yaxes(tickmode="array", tickvals=[1, 2, 3],
+                     ticktext=["😟 Stressed", "😐 Neutral", "😊 Happy"],
+                     range=[0.5, 3.5])
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        height=380,
+        hoverlabel=dict(bgcolor="#667eea", font_color="white")
+    )
+    return fig.to_json()
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def distribution_fig_json(dist_counts: pd.DataFrame) -> str:
+    fig = px.bar(
+        dist_counts, x="Mood", y="Count", text="Count",
+        title="Mood Distribution",
+        color="Mood",
+        color_discrete_map=MOOD_COLORS
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_layout(
+        showlegend=False,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        height=360
+    )
+    return fig.to_json()
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def share_fig_json(dist_counts: pd.DataFrame) -> str:
+    fig = px.pie(
+        dist_counts, names="Mood", values="Count",
+        title="Mood Share",
+        color="Mood",
+        color_discrete_map=MOOD_COLORS,
+        hole=0.4
+    )
+    fig.update_traces(
+        hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{percent}<extra></extra>"
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        height=360
+    )
+    return fig.to_json()
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def comparison_fig_json(emp_avg: pd.DataFrame) -> str:
+    fig = px.bar(
+        emp_avg, x="Avg_Mood", y="Employee",
+        orientation="h",
+        title="Average Mood Score per Employee",
+        text=emp_avg["Avg_Mood"].round(2),
+        color="Avg_Mood",
+        color_continuous_scale=["#ef4444", "#f59e0b", "#22c55e"],
+        range_color=[1, 3]
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_layout(
+        xaxis=dict(range=[0, 3.5], tickvals=[1, 2, 3],
+                   ticktext=["Stressed", "Neutral", "Happy"]),
+        yaxis=dict(autorange="reversed"),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        height=max(350, len(emp_avg) * 28),
+        coloraxis_showscale=False
+    )
+    return fig.to_json()
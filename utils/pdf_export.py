@@ -3,99 +3,302 @@ PDF Export Utilities — Workforce Intelligence System (FINAL FIXED)
 - Auto-fit tables
 - Wrap long text
 - Prevent cut-off
-- Supports charts (PNG bytes)
+- Supports charts (PNG bytes, file-like or matplotlib Figure)
 - Table + Graph per section
 - Dashboard / Attendance / Mood / Projects / Notifications graphs supported
 """
 
 import io
 import re
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from PIL import Image as PILImage
 from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
 from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle,
+    SimpleDocTemplate, Table, TableStyle, LayoutError,
     Paragraph, Spacer, Image, PageBreak
 )
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
 
 # --------------------------
-# SANITIZE TEXT
+# SHARED STYLES (built once at import)
 # --------------------------
-def _sanitize(value):
-    if value is None:
-        return ""
-    text = str(value)
-    text = text.replace("😊", "Happy").replace("😐", "Neutral")
-    text = text.replace("😔", "Sad").replace("😡", "Angry")
-    text = re.sub(r"[^\x00-\x7F]+", " ", text)
-    return text.strip()
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    "title",
+    fontSize=18,
+    alignment=1,
+    spaceAfter=20
+)
 
 
 # --------------------------
-# BUILD SAFE TABLE
+# SANITIZE TEXT
 # --------------------------
-def _build_table(df, page_width):
-    if df is None or df.empty:
-        return None
-
-    df = df.copy()
-    for col in df.columns:
-        df[col] = df[col].apply(_sanitize)
-
-    styles = getSampleStyleSheet()
-    cell_style = ParagraphStyle(
-        "cell",
-        parent=styles["Normal"],
-        fontSize=7,
-        leading=9
-    )
-
-    data = [list(df.columns)]
-    for _, row in df.iterrows():
-        data.append([Paragraph(str(cell), cell_style) for cell in row])
+# Built once at import. Each emoji is a single code point, so str.translate
+# swaps it for its word in C; any remaining run of non-ASCII becomes one space.
+_EMOJI_MAP = {"😊": "Happy", "😐": "Neutral", "😔": "Sad", "😡": "Angry"}
+_EMOJI_TABLE = str.maketrans(_EMOJI_MAP)
+_ASCII_RE = re.compile(r"[^\x00-\x7F]+")
+
+
+def _sanitize_series(s):
+    """Whole-column version of the cell sanitizer: emoji → word, non-ASCII → space."""
+    # Numbers, bools and dates cannot hold emoji / non-ASCII and just need str();
+    # everything else (object, string, category...) goes through the sanitizer
+    if (pd.api.types.is_numeric_dtype(s.dtype)
+            or pd.api.types.is_datetime64_any_dtype(s.dtype)
+            or pd.api.types.is_timedelta64_dtype(s.dtype)):
+        return s.astype(str).mask(s.isna(), "")
+
+    # Text columns repeat heavily (department, status, mood...), so run the
+    # regex over the distinct values only and broadcast back by code
+    codes, uniques = pd.factorize(s)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    # Most values are plain ASCII already; only the rest need translate + regex
+    non_ascii = ~text.str.isascii().to_numpy(dtype=bool)
+    if non_ascii.any():
+        text[non_ascii] = (
+            text[non_ascii].str.translate(_EMOJI_TABLE)
+            .str.replace(_ASCII_RE, " ", regex=True)
+        )
+    clean = np.append(text.str.strip().to_numpy(), "")  # code -1 (missing) → last slot
+    return pd.Series(clean[codes], index=s.index, name=s.name)
 
-    col_count = len(df.columns)
-    col_width = page_width / col_count
-    col_widths = [col_width] * col_count
 
-    table = Table(data, colWidths=col_widths, repeatRows=1)
-
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
+# --------------------------
+# BUILD SAFE TABLE
+# --------------------------
+# Body cells are Helvetica 7pt. CELL_CHAR_WIDTH is an average glyph width used
+# only to estimate column widths; wrapping measures the real glyph widths.
+CELL_FONT = "Helvetica"
+CELL_FONT_SIZE = 7
+CELL_CHAR_WIDTH = CELL_FONT_SIZE * 0.6
+# No Helvetica glyph is wider than this, so shorter cells never need measuring
+CELL_MAX_CHAR_WIDTH = CELL_FONT_SIZE * 1.02
+HEADER_CHAR_WIDTH = 8 * 0.65
+CELL_PADDING = 8
+
+# Many small tables split across pages far faster than one huge one
+TABLE_CHUNK_ROWS = 200
+
+
+@lru_cache(maxsize=None)
+def _table_style(header_color=colors.lightblue):
+    """One shared TableStyle per header colour; parsed once, reused by every table."""
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), header_color),
         ("GRID", (0, 0), (-1, -1), 0.3, colors.grey),
         ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
         ("FONTSIZE", (0, 0), (-1, 0), 8),
+        ("FONTNAME", (0, 1), (-1, -1), CELL_FONT),
+        ("FONTSIZE", (0, 1), (-1, -1), CELL_FONT_SIZE),
+        ("LEADING", (0, 1), (-1, -1), 9),
         ("VALIGN", (0, 0), (-1, -1), "TOP"),
         ("LEFTPADDING", (0, 0), (-1, -1), 4),
         ("RIGHTPADDING", (0, 0), (-1, -1), 4),
         ("TOPPADDING", (0, 0), (-1, -1), 3),
         ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-    ]))
-
-    return table
+    ])
+
+
+def _column_widths(lengths, headers, page_width):
+    """
+    Size columns from their content instead of splitting page_width evenly.
+    lengths holds one array of cell text lengths per column. Each column's
+    natural width covers its 95th-percentile text length (and its bold
+    header). Columns narrower than a shared level keep their natural width;
+    the wide ones split what is left equally, so short ID/date columns never
+    wrap and long text gets the room. Spare width is spread proportionally.
+    """
+    body = np.fromiter((np.quantile(n, 0.95) for n in lengths), dtype=float, count=len(lengths))
+    header = np.fromiter((len(str(c)) for c in headers), dtype=float, count=len(headers))
+    natural = np.maximum(body * CELL_CHAR_WIDTH, header * HEADER_CHAR_WIDTH) + CELL_PADDING
+
+    total = natural.sum()
+    if total <= page_width:
+        return (natural * (page_width / total)).tolist()
+
+    # Water-fill: find the level where min(natural, level) sums to page_width
+    ordered = np.sort(natural)
+    remaining, left = page_width, len(ordered)
+    for w in ordered:
+        if w * left > remaining:
+            break
+        remaining -= w
+        left -= 1
+    level = remaining / left
+    return np.minimum(natural, level).tolist()
+
+
+def _text_width(text):
+    return stringWidth(text, CELL_FONT, CELL_FONT_SIZE)
+
+
+def _wrap_to_width(text, avail):
+    """
+    Greedy word wrap of text into lines no wider than avail points, measured
+    with the cell font's real glyph widths. Words wider than a whole line are
+    broken between characters.
+    """
+    lines = []
+    for para in text.split("\n"):
+        line = ""
+        for word in para.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if _text_width(candidate) <= avail:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while len(word) > 1 and _text_width(word) > avail:
+                cut, used = 1, _text_width(word[0])
+                while cut < len(word) and used + _text_width(word[cut]) <= avail:
+                    used += _text_width(word[cut])
+                    cut += 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _build_table(df, page_width, header_color=colors.lightblue):
+    """
+    Return a list of Table flowables for df, TABLE_CHUNK_ROWS body rows each
+    (header repeated). The caller's frame is neither modified nor copied:
+    each column is sanitized into its own string array and rows are zipped
+    straight from those arrays.
+    """
+    if df is None or df.empty:
+        return []
+
+    headers = list(df.columns)
+    # Column-wise .str kernels instead of a Python call per cell
+    cells = [_sanitize_series(df.iloc[:, i]).to_numpy(dtype=object) for i in range(len(headers))]
+    lengths = [np.fromiter(map(len, col), dtype=np.int64, count=len(col)) for col in cells]
+
+    col_widths = _column_widths(lengths, headers, page_width)
+
+    # Table draws multi-line plain strings itself but never clips them, so text
+    # that may overflow is pre-wrapped with newlines at its measured width
+    # rather than parsed into a Paragraph per cell. Each distinct value is
+    # wrapped once per column.
+    for col, n, width in zip(cells, lengths, col_widths):
+        avail = width - CELL_PADDING
+        maybe_long = np.flatnonzero(n * CELL_MAX_CHAR_WIDTH > avail)
+        if maybe_long.size:
+            wrapped = {}
+            for i in maybe_long:
+                text = col[i]
+                if text not in wrapped:
+                    wrapped[text] = _wrap_to_width(text, avail) if _text_width(text) > avail else text
+                col[i] = wrapped[text]
+
+    rows = list(map(list, zip(*cells)))
+    return [
+        Table([headers] + rows[start:start + TABLE_CHUNK_ROWS], colWidths=col_widths,
+              repeatRows=1, style=_table_style(header_color))
+        for start in range(0, len(rows), TABLE_CHUNK_ROWS)
+    ]
 
 
 # --------------------------
 # PNG → IMAGE
 # --------------------------
-def _png_to_image(png_bytes, width=9, height=4):
-    if png_bytes is None:
+# 100 dpi is already sharper than the ~9in print width needs
+FIG_DPI = 100
+# Charts are laid out at the size they are embedded at (inches), so the PDF
+# never stretches them and one pixel maps to one 1/100 in
+FIG_SIZE = (9, 4)
+
+
+def _render_rgb(fig):
+    """
+    Draw fig on its Agg canvas at FIG_SIZE / FIG_DPI and return the pixels
+    as an RGB PIL image; the figure's own size and dpi are restored after.
+    Charts are opaque, so the alpha channel is dropped: ReportLab would
+    otherwise split it into a separate soft-mask image for every chart.
+    """
+    canvas_ = fig.canvas
+    if not hasattr(canvas_, "buffer_rgba"):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        canvas_ = FigureCanvasAgg(fig)
+    dpi, size = fig.dpi, fig.get_size_inches().copy()
+    fig.set_dpi(FIG_DPI)
+    fig.set_size_inches(FIG_SIZE)
+    try:
+        fig.tight_layout()
+        canvas_.draw()
+        return PILImage.fromarray(np.asarray(canvas_.buffer_rgba())[..., :3])
+    finally:
+        fig.set_dpi(dpi)
+        fig.set_size_inches(size)
+
+
+def _render_to(fig, fmt, **save_kwargs):
+    """Render fig into a fresh BytesIO in the given PIL format, rewound."""
+    buf = io.BytesIO()
+    _render_rgb(fig).save(buf, format=fmt, **save_kwargs)
+    buf.seek(0)
+    return buf
+
+
+def fig_to_png(fig, close=True):
+    """
+    Render a matplotlib Figure to RGB PNG bytes for the PDF.
+    One tight_layout() pass instead of bbox_inches="tight" (which renders twice).
+    """
+    # The PNG is re-compressed when embedded, so use zlib's fastest level
+    buf = _render_to(fig, "PNG", compress_level=1)
+    if close:
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+    return buf.getvalue()
+
+
+def _png_to_image(image, width=FIG_SIZE[0], height=FIG_SIZE[1]):
+    """
+    Return a ReportLab Image for PNG bytes, a binary file-like holding a PNG,
+    or a matplotlib Figure (rendered here). None / failures → None.
+    """
+    if image is None:
         return None
     try:
-        buf = io.BytesIO(png_bytes)
+        # Each Image keeps its buffer until doc.build() draws it, so buffers
+        # cannot be pooled; just avoid copying the PNG more than once
+        if isinstance(image, (bytes, bytearray)):
+            buf = io.BytesIO(image)
+        elif hasattr(image, "savefig"):
+            # ReportLab decodes images to raw pixels and zlib-compresses them
+            # itself, so an uncompressed PPM skips a PNG encode + decode
+            buf = _render_to(image, "PPM")
+        else:
+            buf = image
+            buf.seek(0)
         return Image(buf, width * inch, height * inch)
     except Exception:
         return None
 
 
+def _chart_block(fig):
+    """Flowables for an optional chart: (Spacer, Image), or () if there is none."""
+    img = _png_to_image(fig) if fig else None
+    return (Spacer(1, 12), img) if img else ()
+
+
 # --------------------------
 # MASTER REPORT
 # --------------------------
 def generate_master_report(
-    buffer,
+    buffer=None,
     employees_df=None,
     attendance_df=None,
     mood_df=None,
@@ -108,8 +311,14 @@ def generate_master_report(
     notification_fig=None,
     title="MASTER WORKFORCE REPORT"
 ):
+    """
+    Write the report to buffer (a path or writable binary file-like) and
+    return None, or return the PDF as bytes when no buffer is given.
+    The buffer is left at the end of the written PDF.
+    """
+    output = io.BytesIO() if buffer is None else buffer
     doc = SimpleDocTemplate(
-        buffer,
+        output,
         pagesize=landscape(A4),
         rightMargin=20,
         leftMargin=20,
@@ -117,120 +326,89 @@ def generate_master_report(
         bottomMargin=20
     )
 
-    styles = getSampleStyleSheet()
-    elements = []
     page_width = doc.width
-
-    title_style = ParagraphStyle(
-        "title",
-        fontSize=18,
-        alignment=1,
-        spaceAfter=20
-    )
-
-    elements.append(Paragraph(title, title_style))
-    elements.append(Spacer(1, 12))
+    elements = [Paragraph(title, _TITLE_STYLE), Spacer(1, 12)]
 
     # ---------------- DASHBOARD
     if dashboard_fig:
-        elements.append(Paragraph("Dashboard Analytics", styles["Heading2"]))
-        img = _png_to_image(dashboard_fig)
-        if img:
-            elements.append(Spacer(1, 12))
-            elements.append(img)
-        elements.append(PageBreak())
-
-    # ---------------- EMPLOYEES
-    if employees_df is not None and not employees_df.empty:
-        elements.append(Paragraph("Employees", styles["Heading2"]))
-        table = _build_table(employees_df, page_width)
-        if table:
-            elements.append(table)
+        elements.append(Paragraph("Dashboard Analytics", _STYLES["Heading2"]))
+        elements.extend(_chart_block(dashboard_fig))
         elements.append(PageBreak())
 
-    # ---------------- ATTENDANCE
-    if attendance_df is not None and not attendance_df.empty:
-        elements.append(Paragraph("Attendance", styles["Heading2"]))
-        table = _build_table(attendance_df, page_width)
-        if table:
-            elements.append(table)
-        if attendance_fig:
-            img = _png_to_image(attendance_fig)
-            if img:
-                elements.append(Spacer(1, 12))
-                elements.append(img)
-        elements.append(PageBreak())
-
-    # ---------------- MOOD
-    if mood_df is not None and not mood_df.empty:
-        elements.append(Paragraph("Mood Analytics", styles["Heading2"]))
-        table = _build_table(mood_df, page_width)
-        if table:
-            elements.append(table)
-        if mood_fig:
-            img = _png_to_image(mood_fig)
-            if img:
-                elements.append(Spacer(1, 12))
-                elements.append(img)
-        elements.append(PageBreak())
-
-    # ---------------- PROJECTS
-    if projects_df is not None and not projects_df.empty:
-        elements.append(Paragraph("Projects", styles["Heading2"]))
-        table = _build_table(projects_df, page_width)
-        if table:
-            elements.append(table)
-        if project_fig:
-            img = _png_to_image(project_fig)
-            if img:
-                elements.append(Spacer(1, 12))
-                elements.append(img)
-        elements.append(PageBreak())
-
-    # ---------------- NOTIFICATIONS
-    if notifications_df is not None and not notifications_df.empty:
-        elements.append(Paragraph("Notifications", styles["Heading2"]))
-        table = _build_table(notifications_df, page_width)
-        if table:
-            elements.append(table)
-        if notification_fig:
-            img = _png_to_image(notification_fig)
-            if img:
-                elements.append(Spacer(1, 12))
-                elements.append(img)
+    # ---------------- TABLE SECTIONS (heading → table → optional chart)
+    sections = (
+        ("Employees", employees_df, None),
+        ("Attendance", attendance_df, attendance_fig),
+        ("Mood Analytics", mood_df, mood_fig),
+        ("Projects", projects_df, project_fig),
+        ("Notifications", notifications_df, notification_fig),
+    )
+    for heading, df, fig in sections:
+        if df is None or df.empty:
+            continue
+        elements.append(Paragraph(heading, _STYLES["Heading2"]))
+        elements.extend(_build_table(df, page_width))
+        elements.extend(_chart_block(fig))
         elements.append(PageBreak())
 
     doc.build(elements)
-    buffer.seek(0)
+    if buffer is None:
+        return output.getvalue()
 
 
 # --------------------------
 # SUMMARY PDF
 # --------------------------
-def generate_summary_pdf(buffer, total=0, active=0, resigned=0, df=None, title="Summary Report"):
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(A4),
-        rightMargin=20,
-        leftMargin=20,
-        topMargin=20,
-        bottomMargin=20
-    )
-
-    styles = getSampleStyleSheet()
-    elements = []
-
-    elements.append(Paragraph(title, styles["Title"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(f"Total Records: {total}", styles["Normal"]))
-    elements.append(Paragraph(f"Active: {active}", styles["Normal"]))
-    elements.append(Paragraph(f"Closed / Resigned: {resigned}", styles["Normal"]))
-    elements.append(Spacer(1, 10))
-
-    if df is not None and not df.empty:
-        table = _build_table(df, doc.width)
-        if table:
-            elements.append(table)
-
-    doc.build(elements)
-    buffer.seek(0)
+def generate_summary_pdf(buffer=None, total=0, active=0, resigned=0, df=None, title="Summary Report"):
+    """
+    Drawn straight onto a canvas: a title, three metric lines and the table.
+    No flowable frame layout; the table is split by hand when it overflows a page.
+    Output goes to buffer like generate_master_report (bytes returned if None).
+    """
+    margin = 20
+    page_w, page_h = landscape(A4)
+    width = page_w - 2 * margin
+
+    output = io.BytesIO() if buffer is None else buffer
+    c = canvas.Canvas(output, pagesize=landscape(A4))
+
+    y = page_h - margin - 18
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(page_w / 2, y, title)
+
+    c.setFont("Helvetica", 10)
+    y -= 30
+    for line in (f"Total Records: {total}", f"Active: {active}", f"Closed / Resigned: {resigned}"):
+        c.drawString(margin, y, line)
+        y -= 14
+    y -= 10
+
+    pending = _build_table(df, width)
+    while pending:
+        table = pending.pop(0)
+        _, h = table.wrapOn(c, width, y - margin)
+        if h > y - margin:
+            parts = table.split(width, y - margin)
+            if len(parts) < 2:
+                if y == page_h - margin:
+                    # Already at the top of an empty page: a row is taller than a page
+                    raise LayoutError("Summary table row is too tall to fit on a page")
+                # Nothing fits in the space left on this page
+                c.showPage()
+                y = page_h - margin
+                pending.insert(0, table)
+                continue
+            table = parts[0]
+            pending[:0] = parts[1:]
+            _, h = table.wrapOn(c, width, y - margin)
+            table.drawOn(c, margin, y - h)
+            c.showPage()
+            y = page_h - margin
+            continue
+        table.drawOn(c, margin, y - h)
+        y -= h
+
+    c.showPage()
+    c.save()
+    if buffer is None:
+        return output.getvalue()